@@ -1,52 +1,222 @@
 import requests
 from requests.auth import HTTPBasicAuth
-import json
-import yaml
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import os
+import tempfile
+import time
+import threading
+import logging
+import sys
 import argparse
 from typing import List, Dict, Tuple
-from deepdiff import DeepDiff
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from dataclasses import dataclass, asdict
+
+logger = logging.getLogger(__name__)
+
+# Separator line of the banners
+SEP = "=" * 80
+
+# Configuration file, next to this script
+CONFIG_FILE = (Path(__file__).parent / "config.yaml").resolve()
+
+# Above this size (bytes), config.yaml is loaded from its parser events (see _stream_yaml)
+CONFIG_STREAM_THRESHOLD = 256 * 1024
+
+# Metadata fields to exclude from comparison
+_METADATA_FIELDS = frozenset({
+    'id', 'created_at', 'created_by', 'updated_at', 
+    'updated_by', 'version', 'tenant', 'tenant_id'
+})
+
+
+def _canonical_sort_key(value) -> Tuple[str, str, bytes]:
+    """
+    Sort key of an already canonicalized list item
+
+    Dicts are ordered by name then id, and the serialized value breaks the ties
+    (and orders lists of plain values).
+    """
+    serialized = orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    if isinstance(value, dict):
+        return str(value.get('name', '')), str(value.get('id', '')), serialized
+    return '', '', serialized
+
+
+def _detailed_diff(pair: Tuple[Dict, Dict]) -> Dict:
+    """
+    Computes the detailed diff between a canonicalized source and destination pattern
+    """
+    # Imported on first use: DeepDiff is only needed when differences are displayed
+    from deepdiff import DeepDiff
+
+    source_canonical, dest_canonical = pair
+
+    # Lists are already sorted (and excluded fields removed) by canonicalization
+    return DeepDiff(source_canonical, dest_canonical, ignore_order=False)
+
+
+@dataclass(slots=True, frozen=True)
+class TenantCreds:
+    """Credentials of a tenant, as read from config.yaml"""
+    service_account: str
+    api_key: str
+    scope: str
+    name: str
+
+    @classmethod
+    def from_yaml(cls, config: Dict, default_name: str) -> 'TenantCreds':
+        """
+        Builds tenant credentials from a config.yaml entry
+
+        Args:
+            config: Tenant entry {'service_account', 'api_key', 'tsg_id', 'name' (optional)}
+            default_name: Name used when the entry has none
+        """
+        return cls(
+            service_account=config['service_account'],
+            api_key=config['api_key'],
+            scope=f"tsg_id:{config['tsg_id']}",
+            # YAML can parse a name as a number or a boolean (name: 2024), names are compared as text
+            name=str(default_name if config.get('name') is None else config['name'])
+        )
+
+
+class _ApiRetry(Retry):
+    """
+    Retry policy that never resends a POST the server may already have processed
+
+    GET and PUT (idempotent) follow the usual rules: status_forcelist and read errors.
+    POST (creations, OAuth token) is left out of allowed_methods, and only retried on
+    429, or on 503 with a Retry-After header: the request was refused, not processed.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method.upper() == 'POST':
+            return status_code == 429 or (status_code == 503 and has_retry_after)
+        return super().is_retry(method, status_code, has_retry_after)
+
 
 class PrismaAccessSync:
     """DLP configuration synchronization tool between Prisma Access tenants"""
 
-    # Metadata fields to exclude from comparison
-    METADATA_FIELDS = {
-        'id', 'created_at', 'created_by', 'updated_at', 
-        'updated_by', 'version', 'tenant', 'tenant_id'
-    }
+    # Tokens are renewed this many seconds before their announced expiry
+    TOKEN_EXPIRY_MARGIN = 60
+
+    # Number of connections kept open per host
+    HTTP_POOL_SIZE = 32
+
+    # Maximum number of destination tenants synchronized at the same time
+    MAX_PARALLEL_TENANTS = 8
+
+    # Maximum time (seconds) to wait for a rate limit window to reset
+    RATE_LIMIT_MAX_WAIT = 60
+
+    # Metadata fields to exclude from comparison (module-level frozenset, see _METADATA_FIELDS)
+    METADATA_FIELDS = _METADATA_FIELDS
+
+    # Technical fields that can vary between tenants, ignored at any depth when comparing
+    # supported_confidence_levels is often added automatically by the API
+    COMPARISON_EXCLUDED_FIELDS = frozenset({'supported_confidence_levels'})
     
-    def __init__(self, source_creds: Dict, dest_creds_list: List[Dict]):
+    def __init__(self, source_creds: Dict, dest_creds_list: List[Dict], max_concurrency: int = 16):
         """
         Initialize connections to source environment and destinations
 
         Args:
             source_creds: {'service_account': '...', 'api_key': '...', 'scope': '...', 'name': 'Source'}
             dest_creds_list: List of dicts [{'service_account': '...', 'api_key': '...', 'scope': '...', 'name': 'Prod'}, ...]
+            max_concurrency: Maximum number of create/update requests in flight per tenant
         """
+        self.max_concurrency = max_concurrency
         self.source_creds = source_creds
-        self.source_token = self._authenticate(source_creds)
 
-        # Authenticate all destination tenants
-        self.destinations = []
-        for dest_creds in dest_creds_list:
-            try:
-                token = self._authenticate(dest_creds)
-                self.destinations.append({
-                    'name': dest_creds.get('name', f"Tenant {len(self.destinations) + 1}"),
-                    'token': token,
-                    'creds': dest_creds
-                })
-                print(f"✅ Connection successful: {self.destinations[-1]['name']}")
-            except Exception as e:
-                print(f"❌ Connection error {dest_creds.get('name', 'tenant')}: {str(e)}")
+        # Full pattern/profile lists per tenant scope, shared by all views of the same data
+        self._pattern_cache = {}
+        self._profile_cache = {}
+
+        # Last (ETag, decoded body) per (url, tenant scope), to revalidate instead of downloading again
+        self._etag_cache = {}
+
+        # Source configuration, retrieved on first use (see source_state) under its lock
+        self._source_state = None
+        self._source_lock = threading.Lock()
+
+        # Dry-run plans of the last analysis, by destination tenant name (see sync(plans=...))
+        self.plans = {}
+
+        # Single HTTP session for the whole run: connections (and TLS handshakes) are reused
+        # Every tenant being synchronized can have max_concurrency requests in flight on the same host
+        self.session = requests.Session()
+        parallel_tenants = min(len(dest_creds_list), self.MAX_PARALLEL_TENANTS)
+        adapter = HTTPAdapter(
+            pool_connections=self.HTTP_POOL_SIZE,
+            pool_maxsize=max(self.HTTP_POOL_SIZE, max_concurrency * parallel_tenants),
+            max_retries=self._build_retry()
+        )
+        self.session.mount('https://', adapter)
+
+        # Authenticate the source and all destination tenants once, concurrently
+        # The tokens are kept in the tenant states and reused by every sync() call
+        # of this instance: they are only renewed when they expire or are rejected (see _get_token)
+        with ThreadPoolExecutor(max_workers=min(len(dest_creds_list) + 1, self.HTTP_POOL_SIZE)) as executor:
+            source_future = executor.submit(self._connect, source_creds, source_creds.get('name', 'Source'))
+            dest_futures = [
+                executor.submit(self._connect, dest_creds, dest_creds.get('name', f"Tenant {i}"))
+                for i, dest_creds in enumerate(dest_creds_list, 1)
+            ]
+            self.source = source_future.result()
+
+            self.destinations = []
+            for dest_creds, dest_future in zip(dest_creds_list, dest_futures):
+                try:
+                    self.destinations.append(dest_future.result())
+                    logger.info(f"✅ Connection successful: {self.destinations[-1]['name']}")
+                except Exception as e:
+                    logger.error(f"❌ Connection error {dest_creds.get('name', 'tenant')}: {str(e)}")
         
         self.data_pattern_url = "https://api.dlp.paloaltonetworks.com/v1/api/data-pattern"
         self.data_profile_url = "https://api.dlp.paloaltonetworks.com/v1/api/data-profile"
-        print(f"\n📊 {len(self.destinations)} destination tenant(s) connected\n")
+        logger.info(f"\n📊 {len(self.destinations)} destination tenant(s) connected\n")
         
-    def _authenticate(self, creds: Dict) -> str:
-        """Authenticates and retrieves access token"""
+    def _build_retry(self) -> Retry:
+        """
+        Transport-level retry policy for rate limiting (429) and transient server errors
+
+        Waits follow the Retry-After header when the API sends one, exponential backoff
+        otherwise. After the last attempt the response is returned to the caller as is.
+        POST requests are only resent when the server refused them (see _ApiRetry).
+        """
+        return _ApiRetry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'PUT']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+
+    def _connect(self, creds: Dict, name: str) -> Dict:
+        """
+        Authenticates a tenant and returns its connection state
+
+        Returns:
+            {'name': ..., 'token': ..., 'expires_at': ..., 'creds': ..., 'lock': ...}
+        """
+        token, expires_at = self._authenticate(creds)
+        return {
+            'name': name,
+            'token': token,
+            'expires_at': expires_at,
+            'creds': creds,
+            'lock': threading.Lock()
+        }
+
+    def _authenticate(self, creds: Dict) -> Tuple[str, float]:
+        """Authenticates and retrieves access token with its expiry time (time.monotonic() based)"""
         auth_url = "https://auth.apps.paloaltonetworks.com/auth/v1/oauth2/access_token"
         
         data = {
@@ -54,7 +224,7 @@ class PrismaAccessSync:
             "scope": creds['scope']
         }
         
-        response = requests.post(
+        response = self.session.post(
             auth_url,
             data=data,
             auth=HTTPBasicAuth(creds['service_account'], creds['api_key']),
@@ -64,8 +234,134 @@ class PrismaAccessSync:
         if response.status_code != 200:
             raise Exception(f"Authentication error: {response.status_code} - {response.text}")
         
-        return response.json().get("access_token")
+        token_data = response.json()
+        expires_in = token_data.get("expires_in")
+        if expires_in:
+            # Short-lived tokens still get used for half their lifetime instead of expiring at once
+            lifetime = float(expires_in)
+            expires_at = time.monotonic() + lifetime - min(self.TOKEN_EXPIRY_MARGIN, lifetime / 2)
+        else:
+            expires_at = float("inf")
+
+        return token_data.get("access_token"), expires_at
+
+    def _get_token(self, tenant: Dict, rejected_token: str = None) -> str:
+        """
+        Returns a valid token for a tenant, authenticating again when it has expired
+
+        Args:
+            tenant: Tenant connection state
+            rejected_token: Token that the API refused (401), forces a renewal unless already renewed
+        """
+        with tenant['lock']:
+            if time.monotonic() >= tenant['expires_at'] or (rejected_token and tenant['token'] == rejected_token):
+                tenant['token'], tenant['expires_at'] = self._authenticate(tenant['creds'])
+            return tenant['token']
+
+    def _request(self, method: str, url: str, tenant: Dict, extra_headers: Dict = None, **kwargs) -> requests.Response:
+        """
+        Sends an API request on behalf of a tenant
+
+        The token is renewed when it has expired, and the request is retried once
+        with a new token if the API answers 401.
+
+        Args:
+            method: HTTP method
+            url: API endpoint
+            tenant: Tenant connection state
+            extra_headers: Headers to add to the standard API headers
+            **kwargs: Extra arguments for requests (data, ...)
+        """
+        def send(token: str) -> requests.Response:
+            headers = self._get_headers(token)
+            if extra_headers:
+                headers.update(extra_headers)
+            return self.session.request(method, url, headers=headers, **kwargs)
+
+        token = self._get_token(tenant)
+        response = send(token)
+
+        if response.status_code == 401:
+            response = send(self._get_token(tenant, rejected_token=token))
+
+        return response
+
+    def _get_json(self, url: str, tenant: Dict, error_message: str):
+        """
+        Retrieves and decodes a read-only endpoint for a tenant
+
+        When the previous response carried an ETag, it is sent back in If-None-Match
+        and a 304 answer reuses the previously decoded body.
+
+        Args:
+            url: API endpoint
+            tenant: Tenant connection state
+            error_message: Beginning of the exception message on error
+        """
+        key = (url, tenant['creds']['scope'])
+        cached = self._etag_cache.get(key)
+
+        response = self._request(
+            "GET",
+            url,
+            tenant,
+            extra_headers={"If-None-Match": cached[0]} if cached else None
+        )
+
+        if response.status_code == 304 and cached:
+            return cached[1]
+
+        if response.status_code != 200:
+            raise Exception(f"{error_message}: {response.status_code} - {response.text}")
+
+        body = orjson.loads(response.content)
+
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[key] = (etag, body)
+
+        return body
     
+    def _respect_rate_limit(self, response: requests.Response):
+        """
+        Waits for the rate limit window to reset when the API reports no remaining requests
+
+        Args:
+            response: Response of the last API call
+        """
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+
+        try:
+            if int(remaining) > 0:
+                return
+            delay = float(reset)
+        except ValueError:
+            return
+
+        # The reset header is either an epoch timestamp or a delay in seconds: an epoch that
+        # has just passed is still an epoch, so tell them apart by magnitude
+        if delay > 1e9:
+            delay -= time.time()
+        time.sleep(min(max(delay, 0), self.RATE_LIMIT_MAX_WAIT))
+
+    def _run_concurrently(self, func, items: List) -> List[Tuple]:
+        """
+        Runs an API operation over several items with at most max_concurrency requests in flight
+
+        Args:
+            func: Operation to run for each item
+            items: Items to process
+
+        Returns:
+            List of (item, error) in the order of items, error being None on success
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(items)))) as executor:
+            futures = [executor.submit(func, item) for item in items]
+            return [(item, future.exception()) for item, future in zip(items, futures)]
+
     def _get_headers(self, token: str) -> Dict:
         """Returns headers for API calls"""
         return {
@@ -75,55 +371,70 @@ class PrismaAccessSync:
             "service-name": "dlp-micro-app"
         }
     
-    def get_data_patterns(self, token: str, custom_only: bool = True) -> List[Dict]:
+    def get_data_patterns(self, tenant: Dict, custom_only: bool = True) -> List[Dict]:
         """
         Retrieves data patterns from a tenant
 
+        The full list is fetched once per tenant and cached; the custom view is
+        filtered from it in memory. After invalidation, the list is revalidated
+        with its ETag when the API provides one.
+
         Args:
-            token: Authentication token
+            tenant: Tenant connection state
             custom_only: If True, returns only custom patterns (non-predefined)
         """
-        response = requests.get(
-            self.data_pattern_url,
-            headers=self._get_headers(token)
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"Error during retrieval: {response.status_code} - {response.text}")
-        
-        patterns = response.json().get("resources", [])
+        patterns = self._pattern_cache.get(tenant['creds']['scope'])
+
+        if patterns is None:
+            body = self._get_json(self.data_pattern_url, tenant, "Error during retrieval")
+            patterns = body.get("resources", []) if isinstance(body, dict) else body
+            self._pattern_cache[tenant['creds']['scope']] = patterns
         
         if custom_only:
-            patterns = [p for p in patterns if p.get("type") != "predefined"]
+            patterns = self._filter_custom_patterns(patterns)
         
         return patterns
     
-    def get_data_profiles(self, token: str, custom_only: bool = True) -> List[Dict]:
+    def get_data_profiles(self, tenant: Dict, custom_only: bool = True) -> List[Dict]:
         """
         Retrieves data profiles from a tenant
 
+        The full list is fetched once per tenant and cached; the custom view is
+        filtered from it in memory. After invalidation, the list is revalidated
+        with its ETag when the API provides one.
+
         Args:
-            token: Authentication token
+            tenant: Tenant connection state
             custom_only: If True, returns only custom profiles (non-predefined)
         """
-        response = requests.get(
-            self.data_profile_url,
-            headers=self._get_headers(token)
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"Error retrieving profiles: {response.status_code} - {response.text}")
+        profiles = self._profile_cache.get(tenant['creds']['scope'])
+
+        if profiles is None:
+            profiles = self._get_json(self.data_profile_url, tenant, "Error retrieving profiles")
 
-        profiles = response.json()
+            # The API returns a list directly for profiles
+            if not isinstance(profiles, list):
+                profiles = profiles.get("resources", [])
 
-        # The API returns a list directly for profiles
-        if not isinstance(profiles, list):
-            profiles = profiles.get("resources", [])
+            self._profile_cache[tenant['creds']['scope']] = profiles
         
         if custom_only:
-            profiles = [p for p in profiles if p.get("profile_type") == "custom"]
+            profiles = self._filter_custom_profiles(profiles)
         
         return profiles
+
+    def _filter_custom_patterns(self, patterns: List[Dict]) -> List[Dict]:
+        """Returns only custom patterns (non-predefined)"""
+        return [p for p in patterns if p.get("type") != "predefined"]
+
+    def _filter_custom_profiles(self, profiles: List[Dict]) -> List[Dict]:
+        """Returns only custom profiles"""
+        return [p for p in profiles if p.get("profile_type") == "custom"]
+
+    def _invalidate_cache(self, tenant: Dict):
+        """Drops cached patterns and profiles of a tenant after it has been modified"""
+        self._pattern_cache.pop(tenant['creds']['scope'], None)
+        self._profile_cache.pop(tenant['creds']['scope'], None)
     
     def _normalize_pattern(self, pattern: Dict) -> Dict:
         """
@@ -135,546 +446,876 @@ class PrismaAccessSync:
         Returns:
             Pattern without metadata
         """
-        return {k: v for k, v in pattern.items() if k not in self.METADATA_FIELDS}
+        metadata_fields = _METADATA_FIELDS
+        return {k: v for k, v in pattern.items() if k not in metadata_fields}
     
-    def _remap_pattern_ids(self, profile: Dict, pattern_id_mapping: Dict[str, str]) -> Dict:
+    def _remap_expression_tree(self, tree: Dict, pattern_id_mapping: Dict[str, str]) -> Dict:
         """
-        Replaces pattern IDs in a profile with destination IDs
-
-        Args:
-            profile: Profile containing references to patterns
-            pattern_id_mapping: Mapping source_ID -> destination_ID
+        Replaces IDs in an expression tree, returns a new tree
 
-        Returns:
-            Profile with remapped IDs
-        """
-        import copy
-        profile = copy.deepcopy(profile)
-
-        # Remap IDs in advance_data_patterns_rules
-        if profile.get('advance_data_patterns_rules'):
-            for rule in profile['advance_data_patterns_rules']:
-                if rule.get('conditions'):
-                    for condition in rule['conditions']:
-                        if condition.get('rule_items'):
-                            for rule_item in condition['rule_items']:
-                                if rule_item.get('id') in pattern_id_mapping:
-                                    rule_item['id'] = pattern_id_mapping[rule_item['id']]
-
-        # Remap IDs in detection_rules
-        if profile.get('detection_rules'):
-            for detection_rule in profile['detection_rules']:
-                if detection_rule.get('expression_tree'):
-                    self._remap_expression_tree(detection_rule['expression_tree'], pattern_id_mapping)
-        
-        return profile
-    
-    def _remap_expression_tree(self, tree: Dict, pattern_id_mapping: Dict[str, str]):
-        """
-        Recursively replaces IDs in an expression tree
+        The tree is walked with an explicit stack, so deep trees don't hit the recursion limit.
         """
-        if tree.get('rule_item') and tree['rule_item'].get('id') in pattern_id_mapping:
-            tree['rule_item']['id'] = pattern_id_mapping[tree['rule_item']['id']]
-        
-        if tree.get('sub_expressions'):
-            for sub_expr in tree['sub_expressions']:
-                self._remap_expression_tree(sub_expr, pattern_id_mapping)
+        mapping_get = pattern_id_mapping.get
+        root = dict(tree)
+        stack = [root]
+
+        while stack:
+            node = stack.pop()
+
+            rule_item = node.get('rule_item')
+            if rule_item:
+                new_id = mapping_get(rule_item.get('id'))
+                if new_id is not None:
+                    node['rule_item'] = {**rule_item, 'id': new_id}
+
+            sub_expressions = node.get('sub_expressions')
+            if sub_expressions:
+                sub_expressions = node['sub_expressions'] = [dict(sub_expr) for sub_expr in sub_expressions]
+                stack.extend(sub_expressions)
+
+        return root
     
-    def _build_pattern_id_mapping(self, source_patterns: List[Dict], dest_patterns: List[Dict]) -> Dict[str, str]:
+    def _find_duplicate_names(self, items: List[Dict]) -> List[str]:
+        """Returns the names used by more than one pattern/profile"""
+        seen = set()
+        duplicates = []
+        for item in items:
+            name = item['name']
+            if name in seen and name not in duplicates:
+                duplicates.append(name)
+            seen.add(name)
+        return duplicates
+
+    def _index_by_name(self, items: List[Dict]) -> Dict[str, Dict]:
+        """Indexes patterns/profiles by name (for duplicate names, the last one wins)"""
+        return {p['name']: p for p in items}
+
+    def _build_id_mapping(self, source_items: List[Dict], dest_by_name: Dict[str, Dict]) -> Dict:
         """
-        Builds a mapping of pattern IDs between source and destination based on names
+        Builds a mapping of pattern/profile IDs between source and destination based on names
 
         Args:
-            source_patterns: Patterns from source tenant
-            dest_patterns: Patterns from destination tenant
+            source_items: Patterns/profiles from source tenant
+            dest_by_name: Patterns/profiles from destination tenant, indexed by name (see _index_by_name)
 
         Returns:
             Dictionary {source_id: destination_id}
         """
-        dest_by_name = {p['name']: p['id'] for p in dest_patterns}
-        mapping = {}
-        
-        for source_pattern in source_patterns:
-            source_name = source_pattern['name']
-            source_id = source_pattern['id']
-            
-            if source_name in dest_by_name:
-                mapping[source_id] = dest_by_name[source_name]
-        
-        return mapping
+        return {p['id']: dest_by_name[p['name']]['id'] for p in source_items if p['name'] in dest_by_name}
     
-    def _build_profile_id_mapping(self, source_profiles: List[Dict], dest_profiles: List[Dict]) -> Dict[int, int]:
+    def _canonicalize(self, value):
         """
-        Builds a mapping of profile IDs between source and destination based on names
+        Returns a copy of a value that is independent of list order
 
-        Args:
-            source_profiles: Profiles from source tenant
-            dest_profiles: Profiles from destination tenant
-
-        Returns:
-            Dictionary {source_id: destination_id}
+        Lists are sorted (dicts by name then id, which keeps the same items aligned
+        in the detailed diff) and COMPARISON_EXCLUDED_FIELDS are removed at any depth,
+        so that two canonical forms can be compared with ==.
         """
-        dest_by_name = {p['name']: p['id'] for p in dest_profiles}
-        mapping = {}
-        
-        for source_profile in source_profiles:
-            source_name = source_profile['name']
-            source_id = source_profile['id']
-            
-            if source_name in dest_by_name:
-                mapping[source_id] = dest_by_name[source_name]
-        
-        return mapping
-    
-    def _remap_profile_ids(self, profile: Dict, profile_id_mapping: Dict[int, int]) -> Dict:
+        if isinstance(value, dict):
+            excluded_fields = self.COMPARISON_EXCLUDED_FIELDS
+            return {k: self._canonicalize(v) for k, v in value.items() if k not in excluded_fields}
+
+        if isinstance(value, list):
+            return sorted((self._canonicalize(v) for v in value), key=_canonical_sort_key)
+
+        return value
+
+    def _walk_profile(self, profile: Dict, pattern_id_mapping: Dict[str, str], profile_id_mapping: Dict[int, int] = None) -> Tuple[Dict, Dict]:
         """
-        Replaces profile IDs in a granular profile with destination IDs
+        Prepares a source profile for a destination in a single pass
+
+        Metadata is removed, pattern and profile IDs are remapped and the canonical form
+        is built. Only the containers leading to remapped IDs are copied, the rest
+        of the profile is shared with the input (which is left untouched).
+        The result is used both to compare with the destination and as create/update body.
 
         Args:
-            profile: Profile containing references to other profiles
-            profile_id_mapping: Mapping source_ID -> destination_ID for profiles
+            profile: Source profile
+            pattern_id_mapping: Mapping of pattern IDs source -> destination
+            profile_id_mapping: Mapping of profile IDs source -> destination (for granular profiles)
 
         Returns:
-            Profile with remapped profile IDs
-        """
-        import copy
-        profile = copy.deepcopy(profile)
-
-        # Remap IDs in detection_rules[].multi_profile.data_profile_ids
-        if profile.get('detection_rules'):
-            for detection_rule in profile['detection_rules']:
-                if detection_rule.get('rule_type') == 'multi_profile':
-                    multi_profile = detection_rule.get('multi_profile')
-                    if multi_profile and multi_profile.get('data_profile_ids'):
-                        remapped_ids = []
-                        for profile_id in multi_profile['data_profile_ids']:
+            Tuple of (prepared_profile, canonical_form)
+        """
+        metadata_fields = _METADATA_FIELDS
+        prepared = {}
+
+        for key, value in profile.items():
+            if key in metadata_fields:
+                continue
+
+            # Remap pattern IDs in advance_data_patterns_rules[].conditions[].rule_items[]
+            if key == 'advance_data_patterns_rules' and value and pattern_id_mapping:
+                rules = []
+                for rule in value:
+                    if rule.get('conditions'):
+                        conditions = []
+                        for condition in rule['conditions']:
+                            if condition.get('rule_items'):
+                                rule_items = [
+                                    {**rule_item, 'id': pattern_id_mapping[rule_item['id']]}
+                                    if rule_item.get('id') in pattern_id_mapping else rule_item
+                                    for rule_item in condition['rule_items']
+                                ]
+                                condition = {**condition, 'rule_items': rule_items}
+                            conditions.append(condition)
+                        rule = {**rule, 'conditions': conditions}
+                    rules.append(rule)
+                value = rules
+
+            # Remap pattern IDs in detection_rules[].expression_tree and
+            # profile IDs in detection_rules[].multi_profile.data_profile_ids
+            elif key == 'detection_rules' and value and (pattern_id_mapping or profile_id_mapping):
+                detection_rules = []
+                for detection_rule in value:
+                    if pattern_id_mapping and detection_rule.get('expression_tree'):
+                        expression_tree = self._remap_expression_tree(detection_rule['expression_tree'], pattern_id_mapping)
+                        detection_rule = {**detection_rule, 'expression_tree': expression_tree}
+
+                    if profile_id_mapping and detection_rule.get('rule_type') == 'multi_profile':
+                        multi_profile = detection_rule.get('multi_profile')
+                        if multi_profile and multi_profile.get('data_profile_ids'):
                             # Use the mapped ID if it exists, otherwise keep the original
-                            remapped_ids.append(profile_id_mapping.get(profile_id, profile_id))
-                        multi_profile['data_profile_ids'] = remapped_ids
-        
-        return profile
-    
-    def compare_patterns(self, source_patterns: List[Dict], dest_patterns: List[Dict], pattern_id_mapping: Dict[str, str] = None, profile_id_mapping: Dict[int, int] = None) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+                            remapped_ids = [
+                                profile_id_mapping.get(profile_id, profile_id)
+                                for profile_id in multi_profile['data_profile_ids']
+                            ]
+                            detection_rule = {**detection_rule, 'multi_profile': {**multi_profile, 'data_profile_ids': remapped_ids}}
+
+                    detection_rules.append(detection_rule)
+                value = detection_rules
+
+            prepared[key] = value
+
+        return prepared, self._canonicalize(prepared)
+
+    def compare_patterns(self, source_patterns: List[Dict], dest_patterns: List[Dict], prepared_sources: Dict[str, Dict] = None, with_diff: bool = True, dest_by_name: Dict[str, Dict] = None, source_canonicals: Dict[str, Dict] = None) -> Tuple[List[Dict], List[Dict], List[Dict]]:
         """
         Compares source and destination patterns
 
         Args:
             source_patterns: Source patterns/profiles
             dest_patterns: Destination patterns/profiles
-            pattern_id_mapping: Optional mapping to remap pattern IDs (for profiles)
-            profile_id_mapping: Optional mapping to remap profile IDs (for granular profiles)
+            prepared_sources: Source contents to compare, by name (normalized, with remapped IDs
+                for profiles). Normalized from source_patterns if not provided
+            with_diff: If True, computes the detailed DeepDiff of patterns to update (None otherwise)
+            dest_by_name: dest_patterns indexed by name, when already built by the caller
+            source_canonicals: Canonical forms of prepared_sources, by name, when already built
 
         Returns:
             Tuple of (patterns_to_create, patterns_to_update, identical_patterns)
         """
+        if prepared_sources is None:
+            prepared_sources = {p['name']: self._normalize_pattern(p) for p in source_patterns}
+
         # Create dictionaries indexed by name to facilitate comparison
-        source_dict = {p['name']: p for p in source_patterns}
-        dest_dict = {p['name']: p for p in dest_patterns}
+        source_dict = self._index_by_name(source_patterns)
+        dest_dict = dest_by_name if dest_by_name is not None else self._index_by_name(dest_patterns)
         
         to_create = []
         to_update = []
         identical = []
+        diff_inputs = []
+        metadata_fields = _METADATA_FIELDS
         
         for name, source_pattern in source_dict.items():
             if name not in dest_dict:
                 # Pattern doesn't exist in destination
                 to_create.append(source_pattern)
             else:
-                # Compare normalized versions
-                source_norm = self._normalize_pattern(source_pattern)
-
-                # If a mapping is provided (for profiles), remap IDs before comparison
-                if pattern_id_mapping:
-                    source_norm = self._remap_pattern_ids(source_norm, pattern_id_mapping)
-
-                # If a profile ID mapping is provided, also remap these IDs
-                if profile_id_mapping:
-                    source_norm = self._remap_profile_ids(source_norm, profile_id_mapping)
-                
-                dest_norm = self._normalize_pattern(dest_dict[name])
-
-                # Exclude technical fields that can vary between tenants
-                # supported_confidence_levels is often added automatically by the API
-                diff = DeepDiff(
-                    source_norm, 
-                    dest_norm, 
-                    ignore_order=True,
-                    exclude_regex_paths=r".*\['supported_confidence_levels'\]"
-                )
+                # Compare canonical forms of the normalized versions (list order is ignored)
+                source_canonical = source_canonicals[name] if source_canonicals else self._canonicalize(prepared_sources[name])
+                dest_canonical = self._canonicalize({k: v for k, v in dest_dict[name].items() if k not in metadata_fields})
 
-                if diff:
-                    # The patterns are different
+                if source_canonical == dest_canonical:
+                    # The patterns are identical
+                    identical.append(source_pattern)
+                else:
+                    # The patterns are different, the detailed diff is computed below if needed
                     to_update.append({
                         'source': source_pattern,
                         'destination': dest_dict[name],
-                        'diff': diff
+                        'diff': None
                     })
-                else:
-                    # The patterns are identical
-                    identical.append(source_pattern)
+                    diff_inputs.append((source_canonical, dest_canonical))
+
+        # The detailed diff is only built for display (canonical forms are already aligned,
+        # so an ordered DeepDiff is cheap enough to run inline)
+        if with_diff:
+            for item, pair in zip(to_update, diff_inputs):
+                item['diff'] = _detailed_diff(pair)
         
         return to_create, to_update, identical
     
-    def create_pattern(self, pattern: Dict, token: str) -> Dict:
+    def create_pattern(self, pattern: Dict, tenant: Dict) -> Dict:
         """
         Creates a new data pattern
 
         Args:
-            pattern: Pattern to create (without metadata)
-            token: Authentication token
+            pattern: Pattern to create, normalized (see _normalize_pattern)
+            tenant: Destination tenant connection state
         """
-        # Normalize the pattern to remove metadata
-        clean_pattern = self._normalize_pattern(pattern)
-        
-        response = requests.post(
+        response = self._request(
+            "POST",
             self.data_pattern_url,
-            headers=self._get_headers(token),
-            json=clean_pattern
+            tenant,
+            data=orjson.dumps(pattern)
         )
+        self._respect_rate_limit(response)
         
         if response.status_code not in [200, 201]:
             raise Exception(f"Error during creation: {response.status_code} - {response.text}")
         
-        return response.json()
+        return orjson.loads(response.content)
     
-    def create_profile(self, profile: Dict, token: str, pattern_id_mapping: Dict[str, str], profile_id_mapping: Dict[int, int] = None) -> Dict:
+    def create_profile(self, profile: Dict, tenant: Dict) -> Dict:
         """
         Creates a new data profile
 
         Args:
-            profile: Profile to create (without metadata)
-            token: Authentication token
-            pattern_id_mapping: Mapping of pattern IDs source -> destination
-            profile_id_mapping: Mapping of profile IDs source -> destination (for granular profiles)
+            profile: Profile to create, prepared for the destination (see _walk_profile)
+            tenant: Destination tenant connection state
         """
-        # Normalize and remap pattern IDs
-        clean_profile = self._normalize_pattern(profile)
-        clean_profile = self._remap_pattern_ids(clean_profile, pattern_id_mapping)
-
-        # Remap profile IDs if provided (for granular profiles)
-        if profile_id_mapping:
-            clean_profile = self._remap_profile_ids(clean_profile, profile_id_mapping)
-
         # The creation API requires a specific endpoint and special format
         create_url = f"{self.data_profile_url}/create"
-        payload = {"dataProfile": clean_profile}
+        payload = {"dataProfile": profile}
         
-        response = requests.post(
+        response = self._request(
+            "POST",
             create_url,
-            headers=self._get_headers(token),
-            json=payload
+            tenant,
+            data=orjson.dumps(payload)
         )
+        self._respect_rate_limit(response)
         
         if response.status_code not in [200, 201]:
             raise Exception(f"Error creating profile: {response.status_code} - {response.text}")
         
-        return response.json()
+        return orjson.loads(response.content)
     
-    def update_pattern(self, pattern_id: str, pattern: Dict, token: str) -> Dict:
+    def update_pattern(self, pattern_id: str, pattern: Dict, tenant: Dict) -> Dict:
         """
         Updates an existing data pattern
 
         Args:
             pattern_id: ID of the pattern to modify
-            pattern: New values (without metadata)
-            token: Authentication token
+            pattern: New values, normalized (see _normalize_pattern)
+            tenant: Destination tenant connection state
         """
-        # Normalize the pattern to remove metadata
-        clean_pattern = self._normalize_pattern(pattern)
-        
         url = f"{self.data_pattern_url}/{pattern_id}"
-        response = requests.put(
+        response = self._request(
+            "PUT",
             url,
-            headers=self._get_headers(token),
-            json=clean_pattern
+            tenant,
+            data=orjson.dumps(pattern)
         )
+        self._respect_rate_limit(response)
         
         if response.status_code not in [200, 204]:
             raise Exception(f"Error during update: {response.status_code} - {response.text}")
         
-        return response.json() if response.text else {"status": "updated"}
+        return orjson.loads(response.content) if response.content else {"status": "updated"}
     
-    def update_profile(self, profile_id: str, profile: Dict, token: str, pattern_id_mapping: Dict[str, str], profile_id_mapping: Dict[int, int] = None) -> Dict:
+    def update_profile(self, profile_id: str, profile: Dict, tenant: Dict) -> Dict:
         """
         Updates an existing data profile
 
         Args:
             profile_id: ID of the profile to modify
-            profile: New values (without metadata)
-            token: Authentication token
-            pattern_id_mapping: Mapping of pattern IDs source -> destination
-            profile_id_mapping: Mapping of profile IDs source -> destination (for granular profiles)
+            profile: New values, prepared for the destination (see _walk_profile)
+            tenant: Destination tenant connection state
         """
-        # Normalize and remap pattern IDs
-        clean_profile = self._normalize_pattern(profile)
-        clean_profile = self._remap_pattern_ids(clean_profile, pattern_id_mapping)
-
-        # Remap profile IDs if provided (for granular profiles)
-        if profile_id_mapping:
-            clean_profile = self._remap_profile_ids(clean_profile, profile_id_mapping)
-
         # The update API requires a special format with dataProfile
         url = f"{self.data_profile_url}/{profile_id}"
-        payload = {"dataProfile": clean_profile}
+        payload = {"dataProfile": profile}
         
-        response = requests.put(
+        response = self._request(
+            "PUT",
             url,
-            headers=self._get_headers(token),
-            json=payload
+            tenant,
+            data=orjson.dumps(payload)
         )
+        self._respect_rate_limit(response)
         
         if response.status_code not in [200, 204]:
             raise Exception(f"Error updating profile: {response.status_code} - {response.text}")
         
-        return response.json() if response.text else {"status": "updated"}
+        return orjson.loads(response.content) if response.content else {"status": "updated"}
     
-    def sync(self, dry_run: bool = True, target_tenants: List[str] = None) -> Dict:
+    @property
+    def source_state(self) -> Dict:
+        """
+        Source configuration shared by all destination tenants (see _load_source)
+
+        Retrieved from the API on first access only, then reused by every sync() of this
+        instance. The check, the retrieval and the assignment all happen under the lock,
+        so concurrent first accesses wait for a single retrieval.
+        """
+        with self._source_lock:
+            if self._source_state is None:
+                self._source_state = self._load_source()
+            return self._source_state
+
+    def _load_source(self) -> Dict:
+        """
+        Retrieves and prepares the source configuration, shared by all destination tenants
+
+        Returns:
+            {'all_patterns' (including predefined), 'patterns' (custom), 'prepared_patterns'
+            (normalized, by name), 'pattern_canonicals' (by name), 'profiles' (custom)}
+        """
+        logger.info("🔄 Retrieving source configuration...\n")
+        
+        # Retrieve source patterns and profiles
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            all_source_patterns_future = executor.submit(self.get_data_patterns, self.source, False)
+            source_profiles_future = executor.submit(self.get_data_profiles, self.source)
+            all_source_patterns = all_source_patterns_future.result()
+            source_profiles = source_profiles_future.result()
+        source_patterns = self._filter_custom_patterns(all_source_patterns)
+        logger.info(f"📊 Source ({self.source_creds.get('name', 'Source')}):")
+        logger.info(f"   - {len(source_patterns)} custom data patterns")
+        logger.info(f"   - {len(source_profiles)} custom data profiles\n")
+
+        # Items are matched by name: with duplicates, only the last one is synchronized
+        for kind, items in (("pattern", source_patterns), ("profile", source_profiles)):
+            duplicates = self._find_duplicate_names(items)
+            if duplicates:
+                logger.warning(f"⚠️  Duplicate {kind} names in source, only the last one is synchronized: {', '.join(duplicates)}\n")
+
+        # Source patterns are sent as-is to every tenant, normalize and canonicalize them once
+        prepared_patterns = {p['name']: self._normalize_pattern(p) for p in source_patterns}
+        return {
+            'all_patterns': all_source_patterns,
+            'patterns': source_patterns,
+            'prepared_patterns': prepared_patterns,
+            'pattern_canonicals': {name: self._canonicalize(p) for name, p in prepared_patterns.items()},
+            'profiles': source_profiles
+        }
+
+    def sync(self, dry_run: bool = True, target_tenants: List[str] = None, plans: Dict[str, Dict] = None) -> Dict:
         """
         Synchronizes source configuration to destinations (patterns then profiles)
 
+        Destination tenants are independent of each other, so they are synchronized
+        concurrently (up to MAX_PARALLEL_TENANTS at a time); the output of each tenant
+        is printed as one block, in order.
+
         Args:
             dry_run: If True, performs only analysis without modifications
-            target_tenants: List of tenant names to synchronize (None = all)
+            target_tenants: Tenant names to synchronize, any iterable (None = all)
+            plans: Plans of a previous dry run, by tenant name (see self.plans). When not in
+                dry run, tenants with a plan apply it instead of being analyzed again
 
         Returns:
             Synchronization report for all tenants
         """
-        print("🔄 Retrieving source configuration...\n")
-        
-        # Retrieve source patterns and profiles
-        source_patterns = self.get_data_patterns(self.source_token)
-        source_profiles = self.get_data_profiles(self.source_token)
-        print(f"📊 Source ({self.source_creds.get('name', 'Source')}):")
-        print(f"   - {len(source_patterns)} custom data patterns")
-        print(f"   - {len(source_profiles)} custom data profiles\n")
-
         # Determine which tenants to synchronize
         tenants_to_sync = self.destinations
         if target_tenants:
-            tenants_to_sync = [d for d in self.destinations if d['name'] in target_tenants]
+            target_set = frozenset(target_tenants)
+            tenants_to_sync = [d for d in self.destinations if d['name'] in target_set]
             if not tenants_to_sync:
-                print(f"⚠️  No tenant found among: {target_tenants}")
+                logger.warning(f"⚠️  No tenant found among: {', '.join(sorted(target_set))}")
                 return {}
 
+        # Plans are only applied, a dry run always analyzes again
+        # (copied: self.plans is updated while the tenants are synchronized)
+        plans = dict(plans) if plans and not dry_run else {}
+
+        # Retrieved from the API on the first synchronization only
+        source = self.source_state
+
         # Global report
         global_report = {
             'source_name': self.source_creds.get('name', 'Source'),
-            'source_patterns_count': len(source_patterns),
-            'source_profiles_count': len(source_profiles),
+            'source_patterns_count': len(source['patterns']),
+            'source_profiles_count': len(source['profiles']),
             'tenants': {}
         }
 
-        # Synchronize each destination tenant
-        for dest in tenants_to_sync:
-            print("=" * 80)
-            print(f"🎯 TENANT: {dest['name']}")
-            print("=" * 80)
-            
-            try:
-                # ===== STEP 1: DATA PATTERNS SYNCHRONIZATION =====
-                print("\n📦 STEP 1: DATA PATTERNS SYNCHRONIZATION")
-                print("-" * 80)
-
-                # Retrieve destination patterns
-                dest_patterns = self.get_data_patterns(dest['token'])
-                print(f"📊 Destination: {len(dest_patterns)} custom patterns")
-
-                # Compare
-                patterns_to_create, patterns_to_update, patterns_identical = self.compare_patterns(source_patterns, dest_patterns)
-                
-                report = {
-                    'patterns': {
-                        'to_create': len(patterns_to_create),
-                        'to_update': len(patterns_to_update),
-                        'identical': len(patterns_identical),
-                        'created': [],
-                        'updated': [],
-                        'errors': []
-                    },
-                    'profiles': {
-                        'to_create': 0,
-                        'to_update': 0,
-                        'identical': 0,
-                        'created': [],
-                        'updated': [],
-                        'errors': []
-                    }
-                }
-
-                # Display patterns summary
-                print(f"\n✅ Identical: {len(patterns_identical)}")
-                print(f"➕ To create: {len(patterns_to_create)}")
-                print(f"🔄 To update: {len(patterns_to_update)}")
-
-                if patterns_to_create:
-                    print("\n➕ Patterns to create:")
-                    for pattern in patterns_to_create:
-                        print(f"   - {pattern['name']}")
-
-                if patterns_to_update:
-                    print("\n🔄 Patterns to update:")
-                    for item in patterns_to_update:
-                        print(f"   - {item['source']['name']}")
-                        if dry_run:
-                            print(f"     Differences: {item['diff']}")
-
-                # If not dry_run, create/update patterns
-                if not dry_run:
-                    print("\n" + "-" * 80)
-                    print("🚀 EXECUTING MODIFICATIONS (PATTERNS)")
-                    print("-" * 80)
-
-                    # Create new patterns
-                    if patterns_to_create:
-                        print(f"\n➕ Creating {len(patterns_to_create)} patterns...")
-                        for pattern in patterns_to_create:
-                            try:
-                                result = self.create_pattern(pattern, dest['token'])
-                                report['patterns']['created'].append(pattern['name'])
-                                print(f"   ✅ Created: {pattern['name']}")
-                            except Exception as e:
-                                error_msg = f"Error creating {pattern['name']}: {str(e)}"
-                                report['patterns']['errors'].append(error_msg)
-                                print(f"   ❌ {error_msg}")
-
-                    # Update existing patterns
-                    if patterns_to_update:
-                        print(f"\n🔄 Updating {len(patterns_to_update)} patterns...")
-                        for item in patterns_to_update:
-                            try:
-                                dest_id = item['destination']['id']
-                                result = self.update_pattern(dest_id, item['source'], dest['token'])
-                                report['patterns']['updated'].append(item['source']['name'])
-                                print(f"   ✅ Updated: {item['source']['name']}")
-                            except Exception as e:
-                                error_msg = f"Error updating {item['source']['name']}: {str(e)}"
-                                report['patterns']['errors'].append(error_msg)
-                                print(f"   ❌ {error_msg}")
-
-                    # Reload destination patterns after modification
-                    print("\n🔄 Reloading destination patterns...")
-                    dest_patterns = self.get_data_patterns(dest['token'])
-
-                # ===== STEP 2: DATA PROFILES SYNCHRONIZATION =====
-                print("\n\n📋 STEP 2: DATA PROFILES SYNCHRONIZATION")
-                print("-" * 80)
-
-                # Build pattern ID mapping (ALL patterns, not just custom)
-                all_source_patterns = self.get_data_patterns(self.source_token, custom_only=False)
-                all_dest_patterns = self.get_data_patterns(dest['token'], custom_only=False)
-                pattern_id_mapping = self._build_pattern_id_mapping(all_source_patterns, all_dest_patterns)
-                print(f"🔗 Mapping {len(pattern_id_mapping)} patterns source -> destination")
-
-                # Retrieve destination profiles
-                dest_profiles = self.get_data_profiles(dest['token'])
-                print(f"📊 Destination: {len(dest_profiles)} custom profiles")
-
-                # Build profile ID mapping (for granular profiles)
-                profile_id_mapping = self._build_profile_id_mapping(source_profiles, dest_profiles)
-                print(f"🔗 Mapping {len(profile_id_mapping)} profiles source -> destination")
-                
-                # Compare profiles (with remapping of pattern and profile IDs)
-                profiles_to_create, profiles_to_update, profiles_identical = self.compare_patterns(
-                    source_profiles, dest_profiles, pattern_id_mapping, profile_id_mapping
+        # Synchronize all destination tenants concurrently
+        if tenants_to_sync:
+            with ThreadPoolExecutor(max_workers=min(len(tenants_to_sync), self.MAX_PARALLEL_TENANTS)) as executor:
+                results = executor.map(
+                    lambda dest: self._sync_tenant(dest, source, dry_run, plans.get(dest['name'])),
+                    tenants_to_sync
                 )
-
-                report['profiles']['to_create'] = len(profiles_to_create)
-                report['profiles']['to_update'] = len(profiles_to_update)
-                report['profiles']['identical'] = len(profiles_identical)
-
-                # Display profiles summary
-                print(f"\n✅ Identical: {len(profiles_identical)}")
-                print(f"➕ To create: {len(profiles_to_create)}")
-                print(f"🔄 To update: {len(profiles_to_update)}")
-
-                if profiles_to_create:
-                    print("\n➕ Profiles to create:")
-                    for profile in profiles_to_create:
-                        print(f"   - {profile['name']}")
-
-                if profiles_to_update:
-                    print("\n🔄 Profiles to update:")
-                    for item in profiles_to_update:
-                        print(f"   - {item['source']['name']}")
-                        if dry_run:
-                            print(f"     Differences: {item['diff']}")
-
-                # If dry_run, skip to next tenant
-                if dry_run:
-                    print("\n⚠️  DRY RUN Mode - No modifications made")
+                for dest, (report, output, plan) in zip(tenants_to_sync, results):
+                    self._log_tenant_output(dest['name'], report, output)
                     global_report['tenants'][dest['name']] = report
-                    print()
-                    continue
-
-                # If not dry_run, create/update profiles
-                print("\n" + "-" * 80)
-                print("🚀 EXECUTING MODIFICATIONS (PROFILES)")
-                print("-" * 80)
-
-                # Create new profiles
-                if profiles_to_create:
-                    print(f"\n➕ Creating {len(profiles_to_create)} profiles...")
-                    for profile in profiles_to_create:
-                        try:
-                            result = self.create_profile(profile, dest['token'], pattern_id_mapping, profile_id_mapping)
-                            report['profiles']['created'].append(profile['name'])
-                            print(f"   ✅ Created: {profile['name']}")
-                        except Exception as e:
-                            error_msg = f"Error creating {profile['name']}: {str(e)}"
-                            report['profiles']['errors'].append(error_msg)
-                            print(f"   ❌ {error_msg}")
-
-                # Update existing profiles
-                if profiles_to_update:
-                    print(f"\n🔄 Updating {len(profiles_to_update)} profiles...")
-                    for item in profiles_to_update:
-                        try:
-                            dest_id = item['destination']['id']
-                            result = self.update_profile(dest_id, item['source'], dest['token'], pattern_id_mapping, profile_id_mapping)
-                            report['profiles']['updated'].append(item['source']['name'])
-                            print(f"   ✅ Updated: {item['source']['name']}")
-                        except Exception as e:
-                            error_msg = f"Error updating {item['source']['name']}: {str(e)}"
-                            report['profiles']['errors'].append(error_msg)
-                            print(f"   ❌ {error_msg}")
-
-                print(f"\n✅ Synchronization of {dest['name']} completed")
-                print(f"   Patterns - Created: {len(report['patterns']['created'])}, Updated: {len(report['patterns']['updated'])}, Errors: {len(report['patterns']['errors'])}")
-                print(f"   Profiles - Created: {len(report['profiles']['created'])}, Updated: {len(report['profiles']['updated'])}, Errors: {len(report['profiles']['errors'])}")
-                
-                global_report['tenants'][dest['name']] = report
-                
-            except Exception as e:
-                print(f"\n❌ Error during synchronization of {dest['name']}: {str(e)}")
-                global_report['tenants'][dest['name']] = {
-                    'error': str(e)
-                }
-
-            print()
+                    # Keep the analysis, so that a confirmed tenant can be applied without redoing it
+                    if plan is not None:
+                        self.plans[dest['name']] = plan
+                    else:
+                        self.plans.pop(dest['name'], None)
 
         # Display global summary
-        print("=" * 80)
-        print("📊 GLOBAL SYNCHRONIZATION SUMMARY")
-        print("=" * 80)
+        logger.info(SEP)
+        logger.info("📊 GLOBAL SYNCHRONIZATION SUMMARY")
+        logger.info(SEP)
 
         for tenant_name, report in global_report['tenants'].items():
             if 'error' in report:
-                print(f"❌ {tenant_name}: ERROR - {report['error']}")
+                logger.error(f"❌ {tenant_name}: ERROR - {report['error']}")
             else:
                 status = "DRY RUN" if dry_run else "COMPLETED"
-                print(f"✅ {tenant_name}: {status}")
-                print(f"   Patterns - Identical: {report['patterns']['identical']} | To create: {report['patterns']['to_create']} | To update: {report['patterns']['to_update']}")
-                print(f"   Profiles - Identical: {report['profiles']['identical']} | To create: {report['profiles']['to_create']} | To update: {report['profiles']['to_update']}")
+                logger.info(f"✅ {tenant_name}: {status}")
+                logger.info(f"   Patterns - Identical: {report['patterns']['identical']} | To create: {report['patterns']['to_create']} | To update: {report['patterns']['to_update']}")
+                logger.info(f"   Profiles - Identical: {report['profiles']['identical']} | To create: {report['profiles']['to_create']} | To update: {report['profiles']['to_update']}")
                 if not dry_run:
-                    print(f"   Patterns - Created: {len(report['patterns']['created'])} | Updated: {len(report['patterns']['updated'])} | Errors: {len(report['patterns']['errors'])}")
-                    print(f"   Profiles - Created: {len(report['profiles']['created'])} | Updated: {len(report['profiles']['updated'])} | Errors: {len(report['profiles']['errors'])}")
+                    logger.info(f"   Patterns - Created: {len(report['patterns']['created'])} | Updated: {len(report['patterns']['updated'])} | Errors: {len(report['patterns']['errors'])}")
+                    logger.info(f"   Profiles - Created: {len(report['profiles']['created'])} | Updated: {len(report['profiles']['updated'])} | Errors: {len(report['profiles']['errors'])}")
         
         return global_report
 
+    def sync_one(self, dest_name: str, dry_run: bool = True) -> Dict:
+        """
+        Synchronizes source configuration to a single destination tenant
+
+        Args:
+            dest_name: Destination tenant name
+            dry_run: If True, performs only analysis without modifications
 
-# --- USAGE EXAMPLE ---
-if __name__ == "__main__":
-    # Parse command-line arguments
+        Returns:
+            Synchronization report of the tenant (None if there is no such tenant)
+        """
+        global_report = self.sync(dry_run=dry_run, target_tenants=frozenset((dest_name,)))
+        return global_report.get('tenants', {}).get(dest_name)
+
+    def _log_tenant_output(self, name: str, report: Dict, output: List[str]):
+        """Logs the output block of a tenant, followed by a one-line ERROR summary if it had errors"""
+        logger.info("\n".join(output))
+        if 'error' in report:
+            logger.error(f"❌ {name}: synchronization failed: {report['error']}")
+        elif report['patterns']['errors'] or report['profiles']['errors']:
+            logger.error(
+                f"❌ {name}: {len(report['patterns']['errors'])} pattern error(s), "
+                f"{len(report['profiles']['errors'])} profile error(s)"
+            )
+
+    def _sync_tenant(self, dest: Dict, source: Dict, dry_run: bool, plan: Dict = None) -> Tuple[Dict, List[str], Dict]:
+        """
+        Synchronizes source configuration to a single destination tenant
+
+        Args:
+            dest: Destination tenant connection state
+            source: Source data {'all_patterns' (including predefined), 'patterns' (custom),
+                'prepared_patterns' (normalized, by name), 'pattern_canonicals' (by name), 'profiles'}
+            dry_run: If True, performs only analysis without modifications
+            plan: Plan of a previous dry run of this tenant, reused (with its source data)
+                instead of analyzing again
+
+        Returns:
+            Tuple of (tenant_report, output_lines, plan), plan is None unless a dry run succeeded
+        """
+        # Output is buffered so that concurrent tenants don't interleave their lines
+        output = []
+        log = output.append
+        # Per-item success lines are only useful when someone is watching (DEBUG level)
+        verbose = logger.isEnabledFor(logging.DEBUG)
+
+        log(SEP)
+        log(f"🎯 TENANT: {dest['name']}")
+        log(SEP)
+        
+        if plan is not None:
+            source = plan['source']
+        all_source_patterns = source['all_patterns']
+        prepared_patterns = source['prepared_patterns']
+        source_profiles = source['profiles']
+
+        try:
+            if plan is None:
+                # Retrieve destination data concurrently (independent GETs)
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    all_dest_patterns_future = executor.submit(self.get_data_patterns, dest, False)
+                    dest_profiles_future = executor.submit(self.get_data_profiles, dest)
+                    all_dest_patterns = all_dest_patterns_future.result()
+                    dest_profiles = dest_profiles_future.result()
+            else:
+                all_dest_patterns = plan['all_dest_patterns']
+                dest_profiles = plan['dest_profiles']
+            dest_patterns = self._filter_custom_patterns(all_dest_patterns)
+
+            # ===== STEP 1: DATA PATTERNS SYNCHRONIZATION =====
+            log("\n📦 STEP 1: DATA PATTERNS SYNCHRONIZATION")
+            log("-" * 80)
+
+            log(f"📊 Destination: {len(dest_patterns)} custom patterns")
+
+            # Compare
+            if plan is None:
+                patterns_to_create, patterns_to_update, patterns_identical = self.compare_patterns(
+                    source['patterns'], dest_patterns, prepared_patterns, with_diff=dry_run,
+                    source_canonicals=source['pattern_canonicals']
+                )
+            else:
+                patterns_to_create, patterns_to_update, patterns_identical = plan['patterns']
+            
+            report = {
+                'patterns': {
+                    'to_create': len(patterns_to_create),
+                    'to_update': len(patterns_to_update),
+                    'identical': len(patterns_identical),
+                    'created': [],
+                    'updated': [],
+                    'errors': []
+                },
+                'profiles': {
+                    'to_create': 0,
+                    'to_update': 0,
+                    'identical': 0,
+                    'created': [],
+                    'updated': [],
+                    'errors': []
+                }
+            }
+
+            # Display patterns summary
+            log(f"\n✅ Identical: {len(patterns_identical)}")
+            log(f"➕ To create: {len(patterns_to_create)}")
+            log(f"🔄 To update: {len(patterns_to_update)}")
+
+            if patterns_to_create:
+                log("\n➕ Patterns to create:")
+                for pattern in patterns_to_create:
+                    log(f"   - {pattern['name']}")
+
+            if patterns_to_update:
+                log("\n🔄 Patterns to update:")
+                for item in patterns_to_update:
+                    log(f"   - {item['source']['name']}")
+                    if dry_run:
+                        log(f"     Differences: {item['diff']}")
+
+            # If not dry_run, create/update patterns
+            if not dry_run:
+                log("\n" + "-" * 80)
+                log("🚀 EXECUTING MODIFICATIONS (PATTERNS)")
+                log("-" * 80)
+
+                # Create new patterns
+                if patterns_to_create:
+                    log(f"\n➕ Creating {len(patterns_to_create)} patterns...")
+                    results = self._run_concurrently(
+                        lambda pattern: self.create_pattern(prepared_patterns[pattern['name']], dest),
+                        patterns_to_create
+                    )
+                    for pattern, error in results:
+                        if error is None:
+                            report['patterns']['created'].append(pattern['name'])
+                            if verbose:
+                                log(f"   ✅ Created: {pattern['name']}")
+                        else:
+                            error_msg = f"Error creating {pattern['name']}: {str(error)}"
+                            report['patterns']['errors'].append(error_msg)
+                            log(f"   ❌ {error_msg}")
+
+                # Update existing patterns
+                if patterns_to_update:
+                    log(f"\n🔄 Updating {len(patterns_to_update)} patterns...")
+                    results = self._run_concurrently(
+                        lambda item: self.update_pattern(item['destination']['id'], prepared_patterns[item['source']['name']], dest),
+                        patterns_to_update
+                    )
+                    for item, error in results:
+                        if error is None:
+                            report['patterns']['updated'].append(item['source']['name'])
+                            if verbose:
+                                log(f"   ✅ Updated: {item['source']['name']}")
+                        else:
+                            error_msg = f"Error updating {item['source']['name']}: {str(error)}"
+                            report['patterns']['errors'].append(error_msg)
+                            log(f"   ❌ {error_msg}")
+
+                # Reload destination patterns only when the profile mapping needs the new IDs
+                # (updates keep both the name and the ID of a pattern)
+                if report['patterns']['created'] or report['patterns']['updated']:
+                    self._invalidate_cache(dest)
+                if report['patterns']['created'] and source_profiles:
+                    log("\n🔄 Reloading destination patterns...")
+                    all_dest_patterns = self.get_data_patterns(dest, custom_only=False)
+
+            # ===== STEP 2: DATA PROFILES SYNCHRONIZATION =====
+            log("\n\n📋 STEP 2: DATA PROFILES SYNCHRONIZATION")
+            log("-" * 80)
+
+            log(f"📊 Destination: {len(dest_profiles)} custom profiles")
+
+            if plan is not None and not report['patterns']['created']:
+                # Pattern IDs are unchanged since the dry run, its profile comparison still holds
+                profiles_to_create, profiles_to_update, profiles_identical, prepared_profiles = plan['profiles']
+            else:
+                # Build pattern ID mapping (ALL patterns, not just custom)
+                pattern_id_mapping = self._build_id_mapping(all_source_patterns, self._index_by_name(all_dest_patterns))
+                log(f"🔗 Mapping {len(pattern_id_mapping)} patterns source -> destination")
+
+                # Build profile ID mapping (for granular profiles)
+                dest_profiles_by_name = self._index_by_name(dest_profiles)
+                profile_id_mapping = self._build_id_mapping(source_profiles, dest_profiles_by_name)
+                log(f"🔗 Mapping {len(profile_id_mapping)} profiles source -> destination")
+            
+                # Prepare (normalize, remap and canonicalize) source profiles once for comparison and creation/update
+                prepared_profiles = {}
+                profile_canonicals = {}
+                for profile in source_profiles:
+                    prepared_profiles[profile['name']], profile_canonicals[profile['name']] = self._walk_profile(
+                        profile, pattern_id_mapping, profile_id_mapping
+                    )
+
+                # Compare profiles (with remapping of pattern and profile IDs)
+                profiles_to_create, profiles_to_update, profiles_identical = self.compare_patterns(
+                    source_profiles, dest_profiles, prepared_profiles, with_diff=dry_run,
+                    dest_by_name=dest_profiles_by_name, source_canonicals=profile_canonicals
+                )
+
+            report['profiles']['to_create'] = len(profiles_to_create)
+            report['profiles']['to_update'] = len(profiles_to_update)
+            report['profiles']['identical'] = len(profiles_identical)
+
+            # Display profiles summary
+            log(f"\n✅ Identical: {len(profiles_identical)}")
+            log(f"➕ To create: {len(profiles_to_create)}")
+            log(f"🔄 To update: {len(profiles_to_update)}")
+
+            if profiles_to_create:
+                log("\n➕ Profiles to create:")
+                for profile in profiles_to_create:
+                    log(f"   - {profile['name']}")
+
+            if profiles_to_update:
+                log("\n🔄 Profiles to update:")
+                for item in profiles_to_update:
+                    log(f"   - {item['source']['name']}")
+                    if dry_run:
+                        log(f"     Differences: {item['diff']}")
+
+            # If dry_run, stop here for this tenant
+            if dry_run:
+                log("\n⚠️  DRY RUN Mode - No modifications made")
+                log("")
+                plan = {
+                    'source': source,
+                    'all_dest_patterns': all_dest_patterns,
+                    'dest_profiles': dest_profiles,
+                    'patterns': (patterns_to_create, patterns_to_update, patterns_identical),
+                    'profiles': (profiles_to_create, profiles_to_update, profiles_identical, prepared_profiles)
+                }
+                return report, output, plan
+
+            # If not dry_run, create/update profiles
+            log("\n" + "-" * 80)
+            log("🚀 EXECUTING MODIFICATIONS (PROFILES)")
+            log("-" * 80)
+
+            # Create new profiles
+            if profiles_to_create:
+                log(f"\n➕ Creating {len(profiles_to_create)} profiles...")
+                results = self._run_concurrently(
+                    lambda profile: self.create_profile(prepared_profiles[profile['name']], dest),
+                    profiles_to_create
+                )
+                for profile, error in results:
+                    if error is None:
+                        report['profiles']['created'].append(profile['name'])
+                        if verbose:
+                            log(f"   ✅ Created: {profile['name']}")
+                    else:
+                        error_msg = f"Error creating {profile['name']}: {str(error)}"
+                        report['profiles']['errors'].append(error_msg)
+                        log(f"   ❌ {error_msg}")
+
+            # Update existing profiles
+            if profiles_to_update:
+                log(f"\n🔄 Updating {len(profiles_to_update)} profiles...")
+                results = self._run_concurrently(
+                    lambda item: self.update_profile(item['destination']['id'], prepared_profiles[item['source']['name']], dest),
+                    profiles_to_update
+                )
+                for item, error in results:
+                    if error is None:
+                        report['profiles']['updated'].append(item['source']['name'])
+                        if verbose:
+                            log(f"   ✅ Updated: {item['source']['name']}")
+                    else:
+                        error_msg = f"Error updating {item['source']['name']}: {str(error)}"
+                        report['profiles']['errors'].append(error_msg)
+                        log(f"   ❌ {error_msg}")
+
+            self._invalidate_cache(dest)
+
+            log(f"\n✅ Synchronization of {dest['name']} completed")
+            log(f"   Patterns - Created: {len(report['patterns']['created'])}, Updated: {len(report['patterns']['updated'])}, Errors: {len(report['patterns']['errors'])}")
+            log(f"   Profiles - Created: {len(report['profiles']['created'])}, Updated: {len(report['profiles']['updated'])}, Errors: {len(report['profiles']['errors'])}")
+            
+        except Exception as e:
+            log(f"\n❌ Error during synchronization of {dest['name']}: {str(e)}")
+            report = {
+                'error': str(e)
+            }
+
+        log("")
+        return report, output, None
+
+
+# Field of config.yaml: accepted scalar types, their description for error messages, and
+# whether the field is required (booleans are only accepted when bool is listed)
+_CREDENTIAL_FIELD = ((str, int, float), "a string or a number", True)
+_NAME_FIELD = ((str, int, float, bool), "a string, a number or a boolean", False)
+
+# Expected layout of config.yaml (a dict maps keys to their schema, a list gives the schema
+# of each of its items, a tuple describes a scalar field)
+_TENANT_SCHEMA = {
+    'service_account': _CREDENTIAL_FIELD,
+    'api_key': _CREDENTIAL_FIELD,
+    'tsg_id': _CREDENTIAL_FIELD,
+    'name': _NAME_FIELD
+}
+_REQUIRED = {
+    'source': _TENANT_SCHEMA,
+    'destinations': [_TENANT_SCHEMA]
+}
+
+
+def _validate(config, schema, path: str = "") -> List[str]:
+    """
+    Checks a configuration against a schema, in a single pass
+
+    Scalar fields must be non-empty values of the accepted types; optional fields are
+    only checked when present and not null.
+
+    Args:
+        config: Loaded configuration (or part of it)
+        schema: Dict of nested schemas, list of an item schema, or (types, description, required) field
+        path: Location of config in the file, for error messages
+
+    Returns:
+        Error messages (empty if the configuration is valid)
+    """
+    if isinstance(schema, list):
+        if not isinstance(config, list):
+            return [f"{path or 'configuration'}: expected a list"]
+        errors = []
+        for i, item in enumerate(config):
+            errors += _validate(item, schema[0], f"{path}[{i}]")
+        return errors
+
+    if isinstance(schema, tuple):
+        types, description, _ = schema
+        if not isinstance(config, types) or (isinstance(config, bool) and bool not in types):
+            return [f"{path}: expected {description}"]
+        if isinstance(config, str) and not config.strip():
+            return [f"{path}: empty"]
+        return []
+
+    if not isinstance(config, dict):
+        return [f"{path or 'configuration'}: expected a mapping"]
+
+    errors = []
+    for key in sorted(schema):
+        key_path = f"{path}.{key}" if path else key
+        required = not isinstance(schema[key], tuple) or schema[key][2]
+        if config.get(key) is None:
+            if required:
+                errors.append(f"{key_path}: missing")
+        else:
+            errors += _validate(config[key], schema[key], key_path)
+    return errors
+
+
+class _UnsupportedYaml(Exception):
+    """YAML feature not handled by the event-based config parser"""
+
+
+def _build_from_events(loader):
+    """
+    Builds the next value of a YAML event stream (a scalar, or a whole mapping/sequence)
+
+    Scalars are resolved and constructed like yaml.load() does, one at a time.
+    """
+    import yaml
+
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent) or event.anchor is not None:
+        raise _UnsupportedYaml("anchors and aliases")
+
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        if tag == 'tag:yaml.org,2002:merge':
+            raise _UnsupportedYaml("merge keys")
+        node = yaml.ScalarNode(tag, event.value, style=event.style)
+        value = loader.construct_object(node)
+        # The constructor remembers every node it built, only needed for aliases
+        loader.constructed_objects.pop(node, None)
+        return value
+
+    # Collections with an explicit tag (!!set, !!omap, ...) need the full loader
+    if not event.implicit:
+        raise _UnsupportedYaml(f"tag {event.tag}")
+
+    if isinstance(event, yaml.SequenceStartEvent):
+        sequence = []
+        while not loader.check_event(yaml.SequenceEndEvent):
+            sequence.append(_build_from_events(loader))
+        loader.get_event()
+        return sequence
+
+    if isinstance(event, yaml.MappingStartEvent):
+        mapping = {}
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _build_from_events(loader)
+            if isinstance(key, (list, dict)):
+                raise _UnsupportedYaml("complex keys")
+            mapping[key] = _build_from_events(loader)
+        loader.get_event()
+        return mapping
+
+    raise _UnsupportedYaml(type(event).__name__)
+
+
+def _stream_yaml(data: bytes, loader_class):
+    """
+    Loads a single-document YAML file from its parser events
+
+    Unlike yaml.load(), no node tree of the whole document is built first: values are
+    constructed as they are parsed, which keeps memory low on large configurations.
+
+    Raises:
+        _UnsupportedYaml: The document uses a feature this parser does not handle
+            (anchors/aliases, merge keys, tagged collections, several documents)
+    """
+    import yaml
+
+    loader = loader_class(data)
+    try:
+        if not (isinstance(loader.get_event(), yaml.StreamStartEvent)
+                and isinstance(loader.get_event(), yaml.DocumentStartEvent)):
+            raise _UnsupportedYaml("empty document")
+        value = _build_from_events(loader)
+        if not (isinstance(loader.get_event(), yaml.DocumentEndEvent)
+                and isinstance(loader.get_event(), yaml.StreamEndEvent)):
+            raise _UnsupportedYaml("several documents")
+        return value
+    finally:
+        loader.dispose()
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for options that need at least one worker"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Builds the command-line argument parser"""
     parser = argparse.ArgumentParser(
         description='Synchronizes DLP configuration between Prisma Access tenants',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -713,88 +1354,200 @@ Usage examples:
         dest='tenants',
         help='Name of tenant to synchronize (can be specified multiple times)'
     )
-    
-    args = parser.parse_args()
 
-    # Load configuration from YAML file
-    config_file = Path(__file__).parent / "config.yaml"
+    parser.add_argument(
+        '--max-concurrency',
+        type=_positive_int,
+        default=16,
+        help='Maximum number of create/update requests sent in parallel per tenant (default: 16)'
+    )
+
+    parser.add_argument(
+        '--skip-preview',
+        action='store_true',
+        help='Interactive mode: asks for the tenants without a preliminary analysis (default when stdin is not a terminal)'
+    )
+
+    return parser
 
-    if not config_file.exists():
-        print(f"❌ Configuration file not found: {config_file}")
+
+# Built once at import, reused by every main() call
+_PARSER = _build_parser()
+
+
+def main():
+    """Command-line entry point"""
+    # Parse command-line arguments
+    args = _PARSER.parse_args()
+
+    # Synchronizer output goes to stdout as plain lines; per-item lines only on a terminal
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if sys.stdout.isatty() else logging.INFO)
+    logger.propagate = False
+
+    # Load configuration from YAML file (a single stat gives both existence and mtime)
+    try:
+        config_stat = CONFIG_FILE.stat()
+    except FileNotFoundError:
+        print(f"❌ Configuration file not found: {CONFIG_FILE}")
         print("Please create a config.yaml file with your credentials")
-        exit(1)
+        sys.exit(1)
     
-    with open(config_file, 'r') as f:
-        config = yaml.safe_load(f)
-
-    # Configure source tenant from YAML
-    source_config = config['source']
-    source_creds = {
-        'service_account': source_config['service_account'],
-        'api_key': source_config['api_key'],
-        'scope': f"tsg_id:{source_config['tsg_id']}",
-        'name': source_config.get('name', 'Source')
-    }
-
-    # Configure destination tenants from YAML
-    dest_creds_list = []
-    for dest_config in config['destinations']:
-        dest_creds_list.append({
-            'service_account': dest_config['service_account'],
-            'api_key': dest_config['api_key'],
-            'scope': f"tsg_id:{dest_config['tsg_id']}",
-            'name': dest_config.get('name', f"Tenant {len(dest_creds_list) + 1}")
-        })
-
-    # Initialize the synchronizer with all tenants
+    # The parsed configuration is cached as JSON next to config.yaml, with the exact mtime and
+    # size of the config.yaml it was built from: a restored older config.yaml (cp -p, tar, rsync -t)
+    # does not match either, unlike a "cache newer than config" check
+    cache_file = CONFIG_FILE.with_suffix('.yaml.cache.json')
+    source_key = {'mtime_ns': config_stat.st_mtime_ns, 'size': config_stat.st_size}
+    config = None
+    try:
+        cached = orjson.loads(cache_file.read_bytes())
+        if isinstance(cached, dict) and cached.get('source') == source_key:
+            config = cached.get('config')
+    except (OSError, orjson.JSONDecodeError):
+        config = None
+
+    if config is None:
+        # Imported only when the YAML has to be parsed (not for --help or a cache hit)
+        import yaml
+
+        # Use the libyaml-based loader when available (same safe semantics, faster)
+        Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        data = CONFIG_FILE.read_bytes()
+        config = None
+
+        # Large configurations (hundreds of destinations) are built from the parser events
+        if len(data) > CONFIG_STREAM_THRESHOLD:
+            try:
+                config = _stream_yaml(data, Loader)
+            except _UnsupportedYaml:
+                config = None
+
+        if config is None:
+            config = yaml.load(data, Loader=Loader)
+
+        # The cache is only an optimization, but it must never outlive the config it was built from:
+        # it is written to a temporary file and moved into place, and removed on any failure
+        temp_path = None
+        try:
+            payload = orjson.dumps({'source': source_key, 'config': config})
+            fd, temp_path = tempfile.mkstemp(dir=cache_file.parent, prefix=cache_file.name, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                # The cache holds the same credentials: give it the permissions of config.yaml
+                os.fchmod(f.fileno(), config_stat.st_mode & 0o777)
+                f.write(payload)
+            os.replace(temp_path, cache_file)
+            temp_path = None
+        except (OSError, orjson.JSONEncodeError):
+            try:
+                cache_file.unlink(missing_ok=True)
+                if temp_path is not None:
+                    os.unlink(temp_path)
+            except OSError:
+                pass
+
+    # Report every problem of the configuration at once, before connecting to any tenant
+    errors = _validate(config, _REQUIRED)
+    if errors:
+        print(f"❌ Invalid configuration file: {CONFIG_FILE}")
+        for error in errors:
+            print(f"   - {error}")
+        sys.exit(1)
+
+    # Configure source and destination tenants from YAML
+    source_creds = TenantCreds.from_yaml(config['source'], 'Source')
+    dest_creds_list = [
+        TenantCreds.from_yaml(dest_config, f"Tenant {i}")
+        for i, dest_config in enumerate(config['destinations'], 1)
+    ]
+
+    # Check the requested tenants before paying for any authentication
+    if args.tenants:
+        # Names as the synchronizer will know them (str, defaults included), in config order
+        tenant_names = [dest_creds.name for dest_creds in dest_creds_list]
+        unknown = set(args.tenants).difference(tenant_names)
+        if unknown:
+            print(f"❌ Unknown tenant(s): {', '.join(sorted(unknown))}")
+            print(f"Available tenants: {', '.join(tenant_names)}")
+            sys.exit(2)
+
+    # Initialize the synchronizer with all tenants (authenticated once, for all the modes below)
     print("🔐 Authentication in progress...\n")
-    syncer = PrismaAccessSync(source_creds, dest_creds_list)
+    syncer = PrismaAccessSync(
+        asdict(source_creds),
+        [asdict(dest_creds) for dest_creds in dest_creds_list],
+        max_concurrency=args.max_concurrency
+    )
 
     # Determine execution mode
     dry_run = not args.execute
 
     if args.all and args.execute:
         # Mode: Automatic synchronization of all tenants
-        print("\n" + "=" * 80)
+        print("\n" + SEP)
         print("MODE: Automatic synchronization of all tenants")
-        print("=" * 80 + "\n")
+        print(SEP + "\n")
         report = syncer.sync(dry_run=False)
 
     elif args.tenants:
         # Mode: Synchronization of specific tenants
-        target_names = args.tenants
-        print("\n" + "=" * 80)
+        target_names = frozenset(args.tenants)
+        print("\n" + SEP)
         mode = "Synchronization" if args.execute else "Analysis (DRY RUN)"
-        print(f"MODE: {mode} of tenants: {', '.join(target_names)}")
-        print("=" * 80 + "\n")
+        print(f"MODE: {mode} of tenants: {', '.join(args.tenants)}")
+        print(SEP + "\n")
         report = syncer.sync(dry_run=dry_run, target_tenants=target_names)
 
     elif args.execute:
         # Mode: Interactive synchronization
-        print("\n" + "=" * 80)
+        print("\n" + SEP)
         print("MODE: Interactive synchronization")
-        print("=" * 80 + "\n")
-
-        # First do a dry run to show what will be done
-        print("📊 Preliminary analysis...\n")
-        report = syncer.sync(dry_run=True)
-
-        # Ask for confirmation for each tenant
-        for dest in syncer.destinations:
-            print(f"\n{'=' * 80}")
-            print(f"Do you want to synchronize tenant: {dest['name']}? (yes/no): ", end='')
-            if input().lower() == 'yes':
-                syncer.sync(dry_run=False, target_tenants=[dest['name']])
-            else:
-                print(f"⏭️  {dest['name']} skipped")
+        print(SEP + "\n")
+
+        # First do a dry run to show what will be done, unless nobody is there to read it
+        if args.skip_preview or not sys.stdin.isatty():
+            print("⏭️  Preliminary analysis skipped\n")
+        else:
+            print("📊 Preliminary analysis...\n")
+            report = syncer.sync(dry_run=True)
+
+        # Ask for confirmation once, for all tenants
+        tenant_names = [dest['name'] for dest in syncer.destinations]
+        print(f"\n{SEP}")
+        print(f"Tenants: {', '.join(tenant_names)}")
+        answer = input("Enter comma-separated tenant names to synchronize (or 'all'): ").strip()
+        if answer.lower() == 'all':
+            confirmed = set(tenant_names)
+        else:
+            confirmed = {name.strip() for name in answer.split(',') if name.strip()}
+            unknown = confirmed.difference(tenant_names)
+            if unknown:
+                print(f"⚠️  Unknown tenant(s) ignored: {', '.join(sorted(unknown))}")
+                confirmed -= unknown
+
+        for name in tenant_names:
+            if name not in confirmed:
+                print(f"⏭️  {name} skipped")
+
+        # Synchronize the confirmed tenants together, applying what the preliminary analysis showed
+        if confirmed:
+            print()
+            syncer.sync(dry_run=False, target_tenants=frozenset(confirmed), plans=syncer.plans)
 
     else:
         # Default mode: Dry run of all tenants
-        print("\n" + "=" * 80)
+        print("\n" + SEP)
         print("MODE: Analysis of all tenants (DRY RUN)")
-        print("=" * 80 + "\n")
+        print(SEP + "\n")
         report = syncer.sync(dry_run=True)
 
-        print(f"\n{'=' * 80}")
+        print(f"\n{SEP}")
         print("💡 To execute synchronization, use: python pa_sync.py --execute")
-        print("=" * 80)
\ No newline at end of file
+        print(SEP)
+
+
+# --- USAGE EXAMPLE ---
+if __name__ == "__main__":
+    main()